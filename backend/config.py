@@ -9,6 +9,10 @@ MONGO_USER = os.getenv("MONGO_USER", "root")
 MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "example")
 MONGO_DB = os.getenv("MONGO_DB", "casesdb")
 MONGO_COLLECTION = os.getenv("MONGO_COLLECTION", "cases")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+MONGO_WARM = int(os.getenv("MONGO_WARM", "10"))  # sockets opened at startup, capped at MONGO_MAX_POOL_SIZE
+EXTRA_INDEXES = os.getenv("EXTRA_INDEXES", "0") == "1"  # summary/nsoc_team/labels indexes, for future search endpoints
 
 MONGO_URI = os.getenv(
     "MONGO_URI",
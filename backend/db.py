@@ -1,14 +1,28 @@
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from backend.config import MONGO_URI, MONGO_DB, MONGO_COLLECTION
+import asyncio
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient
+from backend.config import (
+    MONGO_URI, MONGO_DB, MONGO_COLLECTION,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_WARM, EXTRA_INDEXES,
+)
 
-client = MongoClient(MONGO_URI)
+client = AsyncMongoClient(MONGO_URI, maxPoolSize=MONGO_MAX_POOL_SIZE, minPoolSize=MONGO_MIN_POOL_SIZE)
 db = client[MONGO_DB]
 
 cases_col = db[MONGO_COLLECTION]
 oauth_col = db["oauth_tokens"]
 
-def ensure_indexes():
-    cases_col.create_index([("summary", ASCENDING)])
-    cases_col.create_index([("issue_type", ASCENDING)])
-    cases_col.create_index([("nsoc_team", ASCENDING)])
-    cases_col.create_index([("labels", ASCENDING)])
+LEGACY_INDEXES = ("summary_1", "issue_type_1", "nsoc_team_1", "labels_1")
+
+async def ensure_indexes():
+    # list/export: filter by issue_type, newest first -> index range scan, no in-memory sort
+    await cases_col.create_index([("issue_type", ASCENDING), ("created_at", DESCENDING)])
+    if EXTRA_INDEXES:
+        await cases_col.create_index([("summary", ASCENDING)])
+        await cases_col.create_index([("nsoc_team", ASCENDING)])
+        await cases_col.create_index([("labels", ASCENDING)])
+
+async def warm_connection_pool():
+    # Concurrent pings force the driver to open (and authenticate) that many sockets
+    # before the first real request arrives.
+    n = max(0, min(MONGO_WARM, MONGO_MAX_POOL_SIZE))
+    await asyncio.gather(*[db.command("ping") for _ in range(n)])
@@ -1,21 +1,28 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from backend.db import ensure_indexes
+from backend.db import ensure_indexes, warm_connection_pool
 from backend.routers import cases, jira
 
-app = FastAPI(title="Cases → Jira Bulk Create")
+app = FastAPI(title="Cases → Jira Bulk Create", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Content-Disposition"],
 )
 
 @app.on_event("startup")
-def startup():
-    ensure_indexes()
+async def startup():
+    await ensure_indexes()
+    await warm_connection_pool()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await jira.close_http_client()
 
 app.include_router(cases.router)
 app.include_router(jira.router)
@@ -0,0 +1,20 @@
+"""
+Drop indexes that no query uses any more.
+
+Run once, offline:  python -m backend.migrate_indexes
+"""
+import asyncio
+
+from backend.config import EXTRA_INDEXES
+from backend.db import cases_col, LEGACY_INDEXES
+
+async def main():
+    existing = await cases_col.index_information()
+    keep = () if not EXTRA_INDEXES else ("summary_1", "nsoc_team_1", "labels_1")
+    for name in LEGACY_INDEXES:
+        if name in existing and name not in keep:
+            await cases_col.drop_index(name)
+            print(f"dropped {name}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,17 +1,36 @@
 from fastapi import APIRouter, HTTPException, Body, Query
-from fastapi.responses import FileResponse
-from typing import Any, Dict, List
-import csv, os, datetime
-from pymongo import DESCENDING
-
-from backend.models import Payload
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Any, Dict, Iterator, List, Optional
+import csv, io, datetime, operator, pathlib
+from pymongo import DESCENDING, DeleteMany, InsertOne
+from pymongo.errors import BulkWriteError
+
+from backend.routing import ORJSONRoute
+from backend.models import Payload, Row
 from backend.db import cases_col
 
-router = APIRouter(tags=["cases"])
+router = APIRouter(tags=["cases"], route_class=ORJSONRoute)
 
 TEST_HEADERS = ['Summary', 'Issue Type', 'Description', 'Link "Relates"', 'Assignee', 'Labels', 'NSOC_Team', 'Severity']
 BUG_HEADERS  = ['Summary', 'Issue Type', 'Description', 'Link "Problem/Incident"', 'Assignee', 'Labels', 'NSOC_Team', 'Severity']
 Headers = {"Test": TEST_HEADERS, "Bug": BUG_HEADERS}
+_FIELDS = ("summary", "issue_type", "description", "link_relates", "assignee", "labels", "nsoc_team", "severity")
+_ROW_GETTER = operator.attrgetter(*_FIELDS)  # Row -> tuple in CSV column order, in C
+
+CURSOR_BATCH_SIZE = 500
+CSV_CHUNK_ROWS = 500
+_DOWNLOAD_DIR = pathlib.Path.cwd().resolve()
+
+def _iter_csv(headers: List[str], rows: List[Row]) -> Iterator[str]:
+    buf = io.StringIO(newline="")
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    for i in range(0, len(rows), CSV_CHUNK_ROWS):
+        writer.writerows(map(_ROW_GETTER, rows[i:i + CSV_CHUNK_ROWS]))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
 
 @router.post("/save-csv")
 def save_csv(payload: Payload, issue_type: str = Query(...)):
@@ -20,71 +39,113 @@ def save_csv(payload: Payload, issue_type: str = Query(...)):
 
     rows = [
         r for r in payload.rows
-        if any([r.summary, r.issue_type, r.description, r.link_relates, r.assignee, r.labels, r.nsoc_team, r.severity])
+        if any((r.summary, r.issue_type, r.description, r.link_relates, r.assignee, r.labels, r.nsoc_team, r.severity))
     ]
     if not rows:
         raise HTTPException(status_code=400, detail="No non-empty rows to save.")
 
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
     filename = f"{issue_type}-ticket-{ts}.csv"
-    path = os.path.join(os.getcwd(), filename)
-
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(Headers[issue_type])
-        for r in rows:
-            writer.writerow([r.summary, r.issue_type, r.description, r.link_relates, r.assignee, r.labels, r.nsoc_team, r.severity])
 
-    return {"ok": True, "filename": filename}
+    # Straight to the wire: no file on disk, no second request to fetch it
+    return StreamingResponse(
+        _iter_csv(Headers[issue_type], rows),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-@router.get("/download/{filename}")
+# Serves CSVs written by older versions of /save-csv, which no longer touches disk
+@router.get("/download/{filename}", deprecated=True)
 def download_csv(filename: str):
-    path = os.path.join(os.getcwd(), filename)
-    if not os.path.isfile(path):
+    path = (_DOWNLOAD_DIR / filename).resolve()
+    if path.suffix != ".csv" or not path.is_relative_to(_DOWNLOAD_DIR) or not path.is_file():
         raise HTTPException(status_code=404, detail="File not found.")
     return FileResponse(path, media_type="text/csv; charset=utf-8", filename=filename)
 
+@router.get("/export.csv")
+async def export_csv(issue_type: str = Query(...)):
+    if issue_type not in Headers:
+        raise HTTPException(status_code=400, detail='issue_type must be "Test" or "Bug"')
+
+    cursor = cases_col.find({"issue_type": issue_type}, {"_id": 0}).sort([("created_at", DESCENDING)]).batch_size(CURSOR_BATCH_SIZE)
+
+    async def rows():
+        # Stream straight from the cursor in CSV_CHUNK_ROWS chunks: nothing touches disk, memory stays O(batch)
+        buf = io.StringIO(newline="")
+        writer = csv.writer(buf)
+        writer.writerow(Headers[issue_type])
+        pending = 0
+        async for doc in cursor:
+            writer.writerow([doc.get(k, "") for k in _FIELDS])
+            pending += 1
+            if pending == CSV_CHUNK_ROWS:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+                pending = 0
+        yield buf.getvalue()
+
+    filename = f"{issue_type}-tickets.csv"
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @router.post("/save-db")
-def save_db(payload: Dict[str, Any] = Body(...), issue_type: str = Query(...)):
+async def save_db(payload: Dict[str, Any] = Body(...), issue_type: str = Query(...)):
     rows = payload.get("rows") if isinstance(payload, dict) else None
     if not isinstance(rows, list) or not rows:
         raise HTTPException(status_code=400, detail='"rows" must be a non-empty array')
 
-    cases_col.delete_many({"issue_type": issue_type})
-
+    now = datetime.datetime.now(datetime.timezone.utc)  # one ingest time for the whole batch
     docs: List[Dict[str, Any]] = []
     for r in rows:
         if not isinstance(r, dict):
             continue
-        if any([
-            r.get("summary"), r.get("issue_type"), r.get("description"), r.get("link_relates"),
-            r.get("assignee"), r.get("labels"), r.get("nsoc_team"), r.get("severity")
-        ]):
-            docs.append({
-                "summary": str(r.get("summary", "")).strip(),
-                "issue_type": str(r.get("issue_type", "")).strip(),
-                "description": str(r.get("description", "")).strip(),
-                "link_relates": str(r.get("link_relates", "")).strip(),
-                "assignee": str(r.get("assignee", "")).strip(),
-                "labels": str(r.get("labels", "")).strip(),
-                "nsoc_team": str(r.get("nsoc_team", "")).strip(),
-                "severity": str(r.get("severity", "")).strip(),
-                "created_at": datetime.datetime.utcnow(),
-            })
+        doc = {k: "" if (v := r.get(k)) is None else str(v).strip() for k in _FIELDS}
+        if any(doc.values()):
+            doc["created_at"] = now
+            docs.append(doc)
 
     if not docs:
         raise HTTPException(status_code=400, detail="No non-empty rows to save.")
 
-    res = cases_col.insert_many(docs)
-    return {"ok": True, "inserted": len(res.inserted_ids), "mode": "overwrite"}
+    # One op stream: delete the previous rows and insert the new ones in a single round-trip.
+    # Must stay ordered, otherwise the server may run the DeleteMany after the inserts.
+    ops = [DeleteMany({"issue_type": issue_type})] + [InsertOne(d) for d in docs]
+    try:
+        res = await cases_col.bulk_write(ops, ordered=True)
+        inserted = res.inserted_count
+    except BulkWriteError as e:
+        raise HTTPException(status_code=500, detail={
+            "inserted": e.details.get("nInserted", 0),
+            "errors": [
+                {"index": err.get("index", 0) - 1, "error": err.get("errmsg")}
+                for err in e.details.get("writeErrors", [])
+            ],
+        })
+
+    return {"ok": True, "inserted": inserted, "mode": "overwrite"}
 
 @router.get("/cases")
-def list_cases(issue_type: str = Query(...)):
-    items = list(cases_col.find({"issue_type": issue_type}, {"_id": 0}).sort([("created_at", DESCENDING)]))
-    return {"rows": items}
+async def list_cases(
+    issue_type: str = Query(...),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="omit for all rows"),
+):
+    cursor = (
+        cases_col.find({"issue_type": issue_type}, {"_id": 0})
+        .sort([("created_at", DESCENDING)])
+        .skip(skip)
+        .batch_size(CURSOR_BATCH_SIZE)
+    )
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    items = await cursor.to_list(length=None)
+    return {"rows": items, "skip": skip, "limit": limit}
 
 @router.delete("/cases")
-def clear_cases(issue_type: str = Query(...)):
-    res = cases_col.delete_many({"issue_type": issue_type})
+async def clear_cases(issue_type: str = Query(...)):
+    res = await cases_col.delete_many({"issue_type": issue_type})
     return {"ok": True, "deleted": res.deleted_count}
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
-from typing import Any, Dict, List, Optional
-import time, secrets, urllib.parse, requests
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio, functools, hmac, time, secrets, urllib.parse, httpx, orjson
 import re
+from backend.routing import ORJSONRoute
 from backend.models import Payload, Row
 from backend.db import oauth_col
 from backend.config import (
@@ -13,58 +14,116 @@ from backend.config import (
     JIRA_LINK_TYPE_TEST, JIRA_LINK_TYPE_BUG,
 )
 
-router = APIRouter(tags=["jira"])
+router = APIRouter(tags=["jira"], route_class=ORJSONRoute)
+
+# One pooled client for every Atlassian call: keep-alive sockets skip a TCP+TLS handshake per request,
+# and HTTP/2 multiplexes concurrent calls (e.g. link fan-out) over the same connection.
+# Transport retries only cover failed connects, so a POST is never sent twice.
+_http = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=50),
+        retries=2,
+    ),
+    timeout=30,
+    headers={"Accept": "application/json"},
+)
+
+async def close_http_client():
+    await _http.aclose()
+
+# In-process copy of the last valid token, so hot paths skip the Mongo read until it nears expiry.
+_oauth_cache: Dict[str, Any] = {}
+_oauth_cache_exp: float = 0
+_oauth_lock = asyncio.Lock()
+REFRESH_CLAIM_SECONDS = 30  # how long one worker may hold the cross-process refresh claim
 
 # ---- OAuth storage helpers ----------------------------------------------------------------
-def _get_oauth_doc() -> Optional[Dict[str, Any]]:
-    return oauth_col.find_one({"_id": "default"}, {"_id": 0})
+async def _get_oauth_doc() -> Optional[Dict[str, Any]]:
+    return await oauth_col.find_one({"_id": "default"}, {"_id": 0})
+
+async def _save_oauth_doc(doc: Dict[str, Any]):
+    await oauth_col.update_one({"_id": "default"}, {"$set": {"_id": "default", **doc}}, upsert=True)
+    _invalidate_oauth_cache()
 
-def _save_oauth_doc(doc: Dict[str, Any]):
-    oauth_col.update_one({"_id": "default"}, {"$set": {"_id": "default", **doc}}, upsert=True)
+def _invalidate_oauth_cache():
+    global _oauth_cache, _oauth_cache_exp
+    _oauth_cache, _oauth_cache_exp = {}, 0
 
-def _exchange_code_for_tokens(code: str) -> Dict[str, Any]:
-    r = requests.post(
+async def _exchange_code_for_tokens(code: str) -> Dict[str, Any]:
+    r = await _http.post(
         "https://auth.atlassian.com/oauth/token",
         headers={"Content-Type": "application/json"},
-        json={
+        content=orjson.dumps({
             "grant_type": "authorization_code",
             "client_id": ATLASSIAN_CLIENT_ID,
             "client_secret": ATLASSIAN_CLIENT_SECRET,
             "code": code,
             "redirect_uri": ATLASSIAN_REDIRECT_URI,
-        },
+        }),
         timeout=30,
     )
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)
 
-def _refresh_access_token(refresh_token: str) -> Dict[str, Any]:
-    r = requests.post(
+async def _refresh_access_token(refresh_token: str) -> Dict[str, Any]:
+    r = await _http.post(
         "https://auth.atlassian.com/oauth/token",
         headers={"Content-Type": "application/json"},
-        json={
+        content=orjson.dumps({
             "grant_type": "refresh_token",
             "client_id": ATLASSIAN_CLIENT_ID,
             "client_secret": ATLASSIAN_CLIENT_SECRET,
             "refresh_token": refresh_token,
-        },
+        }),
         timeout=30,
     )
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)
 
-def _get_accessible_resources(access_token: str) -> List[Dict[str, Any]]:
-    r = requests.get(
+async def _get_accessible_resources(access_token: str) -> List[Dict[str, Any]]:
+    r = await _http.get(
         "https://api.atlassian.com/oauth/token/accessible-resources",
-        headers={"Authorization": f"Bearer {access_token}", "Accept": "application/json"},
+        headers={"Authorization": f"Bearer {access_token}"},
         timeout=30,
     )
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)
+
+
+def _auth_entry(access_token: str, cloud_id: str, cloud_url: Optional[str]) -> Dict[str, Any]:
+    return {
+        "access_token": access_token,
+        "cloud_id": cloud_id,
+        "cloud_url": cloud_url,
+        # Fixed for the token's lifetime, so built once here instead of on every Jira call
+        "jira_api_base": f"https://api.atlassian.com/ex/jira/{cloud_id}",
+        "auth_headers": {"Authorization": f"Bearer {access_token}"},
+    }
 
+def _cached_access_token(rejected_token: Optional[str]) -> Optional[Dict[str, Any]]:
+    if _oauth_cache and _oauth_cache_exp > time.time() + 60 and _oauth_cache["access_token"] != rejected_token:
+        return _oauth_cache
+    return None
 
-def _ensure_valid_access_token() -> Dict[str, str]:
-    doc = _get_oauth_doc()
+async def _ensure_valid_access_token(rejected_token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    rejected_token: a token Jira just answered 401 for; it is refreshed even if not expired yet.
+    """
+    global _oauth_cache, _oauth_cache_exp
+    if cached := _cached_access_token(rejected_token):
+        return cached
+
+    async with _oauth_lock:
+        # Another request may have refreshed the token while we waited for the lock
+        if cached := _cached_access_token(rejected_token):
+            return cached
+        auth, expires_at = await _load_valid_access_token(rejected_token)
+        _oauth_cache, _oauth_cache_exp = auth, expires_at
+        return auth
+
+async def _load_valid_access_token(rejected_token: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    doc = await _get_oauth_doc()
     if not doc:
         raise HTTPException(status_code=401, detail="Not connected. Please connect to Jira first.")
 
@@ -76,41 +135,91 @@ def _ensure_valid_access_token() -> Dict[str, str]:
     now = int(time.time())
 
     # Token still valid
-    if doc.get("access_token") and doc.get("expires_at", 0) > now + 60:
-        return {"access_token": doc["access_token"], "cloud_id": cloud_id, "cloud_url": cloud_url}
+    if doc.get("access_token") and doc.get("expires_at", 0) > now + 60 and doc["access_token"] != rejected_token:
+        return _auth_entry(doc["access_token"], cloud_id, cloud_url), doc["expires_at"]
 
     # Need refresh
     refresh_token = doc.get("refresh_token")
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Connection Expired. Reconnect.")
 
+    # Other workers may be here at the same time: only the one that claims the refresh
+    # talks to Atlassian (a second refresh would rotate away the first one's token).
+    claimed = await oauth_col.find_one_and_update(
+        {"_id": "default", "refresh_token": refresh_token, "refresh_claimed_until": {"$not": {"$gt": now}}},
+        {"$set": {"refresh_claimed_until": now + REFRESH_CLAIM_SECONDS}},
+    )
+    if not claimed:
+        return await _wait_for_refresh(rejected_token)
+
     try:
-        new_tokens = _refresh_access_token(refresh_token)
-    except requests.HTTPError:
+        new_tokens = await _refresh_access_token(refresh_token)
+    except httpx.HTTPStatusError:
         # refresh token is invalid/revoked -> force login again
-        _save_oauth_doc({
+        await _save_oauth_doc({
             "access_token": None,
             "refresh_token": None,
             "expires_at": 0,
-            "oauth_state": None,
+            "refresh_claimed_until": 0,
             "cloud_id": doc.get("cloud_id"),
             "cloud_url": doc.get("cloud_url"),
         })
         raise HTTPException(status_code=401, detail="Session expired. Please reconnect to Jira.")
+    except Exception:
+        await oauth_col.update_one({"_id": "default"}, {"$set": {"refresh_claimed_until": 0}})
+        raise
     access_token = new_tokens["access_token"]
     refresh_token_new = new_tokens.get("refresh_token", refresh_token)
     expires_at = now + int(new_tokens.get("expires_in", 3600))
 
-    _save_oauth_doc({
+    await _save_oauth_doc({
         "access_token": access_token,
         "refresh_token": refresh_token_new,
         "expires_at": expires_at,
         "cloud_id": cloud_id,
         "cloud_url": cloud_url,
-        "oauth_state": None,
+        "refresh_claimed_until": 0,
     })
 
-    return {"access_token": access_token, "cloud_id": cloud_id, "cloud_url": cloud_url}
+    return _auth_entry(access_token, cloud_id, cloud_url), expires_at
+
+async def _wait_for_refresh(rejected_token: Optional[str]) -> Tuple[Dict[str, Any], int]:
+    """
+    Another worker holds the refresh claim: poll Mongo until its new token shows up.
+    """
+    deadline = time.time() + REFRESH_CLAIM_SECONDS
+    while time.time() < deadline:
+        await asyncio.sleep(0.25)
+        doc = await _get_oauth_doc() or {}
+        if not doc.get("refresh_token"):
+            raise HTTPException(status_code=401, detail="Session expired. Please reconnect to Jira.")
+        token = doc.get("access_token")
+        if token and token != rejected_token and doc.get("expires_at", 0) > time.time() + 60:
+            return _auth_entry(token, doc["cloud_id"], doc.get("cloud_url")), doc["expires_at"]
+    raise HTTPException(status_code=503, detail="Jira token refresh is still in progress. Try again.")
+
+async def _jira_call(method: str, path: str, **kwargs: Any) -> Tuple[httpx.Response, Dict[str, Any]]:
+    """
+    Call the Jira REST API for the connected site. On a 401 the cached token is dropped,
+    refreshed, and the call retried once. Returns the response and the auth that was used.
+    """
+    headers = kwargs.pop("headers", {})
+
+    async def send(auth: Dict[str, Any]) -> httpx.Response:
+        return await _http.request(
+            method,
+            auth["jira_api_base"] + path,
+            headers={**headers, **auth["auth_headers"]},
+            **kwargs,
+        )
+
+    auth = await _ensure_valid_access_token()
+    r = await send(auth)
+    if r.status_code == 401:
+        _invalidate_oauth_cache()
+        auth = await _ensure_valid_access_token(rejected_token=auth["access_token"])
+        r = await send(auth)
+    return r, auth
 
 
 # ------------------------------------------------------------------------------------------------
@@ -118,6 +227,10 @@ def _ensure_valid_access_token() -> Dict[str, str]:
 # ---- Bulk create helpers -----------------------------------------------------------------------
 
 _BOLD_RE = re.compile(r"\*(.+?)\*")  # minimal: *bold*
+# Shared nodes: ADF trees are only serialized, never mutated, so reusing them is safe
+_EMPTY_PARAGRAPH = {"type": "paragraph", "content": []}
+_EMPTY_DOC = {"type": "doc", "version": 1, "content": []}
+_STRONG_MARKS = [{"type": "strong"}]
 
 def _adf_inline(text: str) -> List[Dict[str, Any]]:
     """
@@ -127,12 +240,15 @@ def _adf_inline(text: str) -> List[Dict[str, Any]]:
     nodes: List[Dict[str, Any]] = []
     if text is None:
         return nodes
+    if "*" not in text:
+        # No bold markers -> skip the regex engine entirely
+        return [{"type": "text", "text": text}] if text else nodes
 
     last = 0
     for m in _BOLD_RE.finditer(text):
         if m.start() > last:
             nodes.append({"type": "text", "text": text[last:m.start()]})
-        nodes.append({"type": "text", "text": m.group(1), "marks": [{"type": "strong"}]})
+        nodes.append({"type": "text", "text": m.group(1), "marks": _STRONG_MARKS})
         last = m.end()
 
     if last < len(text):
@@ -142,6 +258,18 @@ def _adf_inline(text: str) -> List[Dict[str, Any]]:
     return [n for n in nodes if n.get("text") != ""]
 
 
+def _adf_list(list_type: str, items: List[str]) -> Dict[str, Any]:
+    return {
+        "type": list_type,
+        "content": [
+            {"type": "listItem", "content": [{"type": "paragraph", "content": _adf_inline(item)}]}
+            for item in items
+        ],
+    }
+
+
+# Templated test cases repeat descriptions a lot; the returned tree is shared, callers must not mutate it
+@functools.lru_cache(maxsize=256)
 def adf_from_plain(text: str) -> Dict[str, Any]:
     """
     Supported syntax:
@@ -153,120 +281,107 @@ def adf_from_plain(text: str) -> Dict[str, Any]:
     """
     text = (text or "").rstrip("\n")
     if not text.strip():
-        return {"type": "doc", "version": 1, "content": []}
+        return _EMPTY_DOC
 
     lines = text.splitlines()
 
+    # Common case: one plain line -> one paragraph, no list state machine needed
+    if len(lines) == 1 and not lines[0].startswith(("- ", "# ")):
+        return {"type": "doc", "version": 1, "content": [
+            {"type": "paragraph", "content": _adf_inline(lines[0].rstrip())}
+        ]}
+
     content: List[Dict[str, Any]] = []
+    append = content.append
+    inline = _adf_inline
 
-    # Buffers for current list block
-    current_list_type: str | None = None   # "bullet" | "ordered"
+    # Buffer for the current list block
+    list_type: str | None = None   # "bulletList" | "orderedList"
     list_items: List[str] = []
-
-    def flush_list():
-        nonlocal current_list_type, list_items
-        if not current_list_type or not list_items:
-            current_list_type = None
-            list_items = []
-            return
-
-        list_node_type = "bulletList" if current_list_type == "bullet" else "orderedList"
-
-        list_node = {
-            "type": list_node_type,
-            "content": [
-                {
-                    "type": "listItem",
-                    "content": [
-                        {
-                            "type": "paragraph",
-                            "content": _adf_inline(item) or []
-                        }
-                    ],
-                }
-                for item in list_items
-            ],
-        }
-        content.append(list_node)
-        current_list_type = None
-        list_items = []
-
-    def add_paragraph(line: str):
-        content.append({
-            "type": "paragraph",
-            "content": _adf_inline(line) or []
-        })
+    add_item = list_items.append
 
     for raw in lines:
         line = raw.rstrip()
+        marker = line[:2]
+        kind = "bulletList" if marker == "- " else "orderedList" if marker == "# " else None
 
-        # blank line -> end lists, add empty paragraph (keeps spacing)
-        if not line.strip():
-            flush_list()
-            content.append({"type": "paragraph", "content": []})
+        # next item of the open list
+        if kind is not None and kind == list_type:
+            add_item(line[2:].strip())
             continue
 
-        # bullet list
-        if line.startswith("- "):
-            item = line[2:].strip()
-            if current_list_type not in (None, "bullet"):
-                flush_list()
-            current_list_type = "bullet"
-            list_items.append(item)
-            continue
-
-        # numeric list using "# "
-        if line.startswith("# "):
-            item = line[2:].strip()
-            if current_list_type not in (None, "ordered"):
-                flush_list()
-            current_list_type = "ordered"
-            list_items.append(item)
-            continue
+        # anything else closes the open list block
+        if list_items:
+            append(_adf_list(list_type, list_items))
+            list_items = []
+            add_item = list_items.append
+        list_type = kind
 
-        # normal paragraph
-        flush_list()
-        add_paragraph(line)
+        if kind is not None:
+            add_item(line[2:].strip())
+        elif not line:
+            # blank line -> empty paragraph (keeps spacing)
+            append(_EMPTY_PARAGRAPH)
+        else:
+            append({"type": "paragraph", "content": inline(line)})
 
-    flush_list()
+    if list_items:
+        append(_adf_list(list_type, list_items))
 
     return {"type": "doc", "version": 1, "content": content}
 
 
+_ISSUE_KEY_RE = re.compile(r"\b[A-Za-z][A-Za-z0-9_]*-\d+\b")  # PROJECT-123
+
 def _split_issue_keys(s: str) -> List[str]:
-    if not s:
-        return []
-    return [t.strip() for t in s.replace(",", " ").split() if t.strip()]
+    # One scan pulls out well-formed keys; stray tokens would only earn a 400 from Jira
+    return [k.upper() for k in _ISSUE_KEY_RE.findall(s or "")]
 
 def _parse_bulk_index_map(resp_json: Dict[str, Any], n_updates: int) -> Dict[int, str]:
     issues = resp_json.get("issues") or []
     errors = resp_json.get("errors") or []
-    failed_nums = [e.get("failedElementNumber") for e in errors if isinstance(e, dict)]
-    failed_nums = [n for n in failed_nums if isinstance(n, int)]
-    one_based = any(n >= n_updates for n in failed_nums)
-    failed = set((n - 1) if one_based else n for n in failed_nums)
-
-    success_indices = [i for i in range(n_updates) if i not in failed]
-    mapping: Dict[int, str] = {}
-    for idx, issue in zip(success_indices, issues):
-        key = issue.get("key")
-        if key:
-            mapping[idx] = key
-    return mapping
-
-def _create_issue_link(cloud_id: str, access_token: str, link_type: str, from_key: str, to_key: str) -> Dict[str, Any]:
-    url = f"https://api.atlassian.com/ex/jira/{cloud_id}/rest/api/3/issueLink"
+    failed_nums = [
+        n for e in errors
+        if isinstance(e, dict) and isinstance(n := e.get("failedElementNumber"), int)
+    ]
+    # Jira has reported failedElementNumber both 0- and 1-based; an out-of-range number means 1-based
+    offset = 1 if failed_nums and max(failed_nums) >= n_updates else 0
+    failed = {n - offset for n in failed_nums}
+
+    # issues[] lists only the successes, in request order
+    success_indices = (i for i in range(n_updates) if i not in failed)
+    return {idx: key for idx, issue in zip(success_indices, issues) if (key := issue.get("key"))}
+
+_PROJECT_FIELD = {"key": JIRA_PROJECT_KEY}
+
+MAX_BULK_ISSUES = 50  # Jira's /issue/bulk limit
+LINK_CONCURRENCY = 8  # max in-flight issueLink calls per bulk create
+LINK_ATTEMPTS = 3     # per link, retried only on 429
+
+def _retry_after_seconds(r: httpx.Response, attempt: int) -> float:
+    try:
+        delay = float(r.headers.get("Retry-After", ""))
+    except ValueError:
+        delay = 2 ** attempt
+    return min(max(delay, 0), 30)
+
+async def _create_issue_link(api_base: str, headers: Dict[str, str], link_type: str, from_key: str, to_key: str) -> Dict[str, Any]:
     body = {
         "type": {"name": link_type},
         "inwardIssue": {"key": from_key},
         "outwardIssue": {"key": to_key},
     }
-    r = requests.post(
-        url,
-        headers={"Authorization": f"Bearer {access_token}", "Accept": "application/json", "Content-Type": "application/json"},
-        json=body,
-        timeout=30,
-    )
+    content = orjson.dumps(body)
+    try:
+        for attempt in range(LINK_ATTEMPTS):
+            r = await _http.post(api_base + "/rest/api/3/issueLink", headers=headers, content=content, timeout=30)
+            if r.status_code != 429 or attempt == LINK_ATTEMPTS - 1:
+                break
+            # Rate limited: wait as long as Jira asks (exponential fallback) instead of hammering it
+            await asyncio.sleep(_retry_after_seconds(r, attempt))
+    except httpx.HTTPError as e:
+        # The issues already exist in Jira: a failed link must not turn the bulk create into a 500
+        return {"ok": False, "status": None, "error": str(e), "from": from_key, "to": to_key, "type": link_type}
     if r.status_code >= 400:
         return {"ok": False, "status": r.status_code, "error": r.text, "from": from_key, "to": to_key, "type": link_type}
     return {"ok": True, "status": r.status_code, "from": from_key, "to": to_key, "type": link_type}
@@ -274,61 +389,75 @@ def _create_issue_link(cloud_id: str, access_token: str, link_type: str, from_ke
 
 
 # ---- OAuth routes ------------------------------------------------------------------------------
+# Everything but the per-request state comes from config, so encode it once at import.
+# state is token_urlsafe output and needs no quoting.
+_OAUTH_AUTHORIZE_URL_PREFIX = "https://auth.atlassian.com/authorize?" + urllib.parse.urlencode({
+    "audience": "api.atlassian.com",
+    "client_id": ATLASSIAN_CLIENT_ID,
+    "scope": ATLASSIAN_SCOPES,
+    "redirect_uri": ATLASSIAN_REDIRECT_URI,
+    "response_type": "code",
+    "prompt": "consent",
+}, quote_via=urllib.parse.quote) + "&state="
+
+_OAUTH_STATE_COOKIE = "atlassian_oauth_state"
+
 @router.get("/oauth/atlassian/start")
-def oauth_start():
+async def oauth_start():
     if not ATLASSIAN_CLIENT_ID or not ATLASSIAN_CLIENT_SECRET:
         raise HTTPException(status_code=500, detail="Missing ATLASSIAN_CLIENT_ID / ATLASSIAN_CLIENT_SECRET")
 
+    # The state lives in a cookie on this browser, not in Mongo: nothing to write per login attempt
     state = secrets.token_urlsafe(32)
-    _save_oauth_doc({"oauth_state": state})
-
-    params = {
-        "audience": "api.atlassian.com",
-        "client_id": ATLASSIAN_CLIENT_ID,
-        "scope": ATLASSIAN_SCOPES,
-        "redirect_uri": ATLASSIAN_REDIRECT_URI,
-        "state": state,
-        "response_type": "code",
-        "prompt": "consent",
-    }
-    url = "https://auth.atlassian.com/authorize?" + urllib.parse.urlencode(params, quote_via=urllib.parse.quote)
-    return RedirectResponse(url)
+    resp = RedirectResponse(_OAUTH_AUTHORIZE_URL_PREFIX + state)
+    resp.set_cookie(
+        _OAUTH_STATE_COOKIE, state,
+        max_age=600, path="/oauth/atlassian",
+        httponly=True, secure=ATLASSIAN_REDIRECT_URI.startswith("https://"), samesite="lax",
+    )
+    return resp
 
 @router.get("/oauth/atlassian/callback")
-def oauth_callback(code: str | None = None, state: str | None = None):
+async def oauth_callback(request: Request, code: str | None = None, state: str | None = None):
     if not code or not state:
         return RedirectResponse(url=f"{FRONTEND_URL}/login.html?error=missing_code_or_state", status_code=302)
 
-    doc = _get_oauth_doc() or {}
-    if doc.get("oauth_state") != state:
+    expected_state = request.cookies.get(_OAUTH_STATE_COOKIE)
+    if not expected_state or not hmac.compare_digest(expected_state.encode(), state.encode()):
         return RedirectResponse(url=f"{FRONTEND_URL}/login.html?error=invalid_state", status_code=302)
 
-    tokens = _exchange_code_for_tokens(code)
+    tokens = await _exchange_code_for_tokens(code)
     access_token = tokens["access_token"]
     refresh_token = tokens.get("refresh_token")
     expires_at = int(time.time()) + int(tokens.get("expires_in", 3600))
 
-    resources = _get_accessible_resources(access_token)
-    match = next((r for r in resources if (r.get("url") == JIRA_SITE_URL)), None)
-    if not match and resources:
-        match = resources[0]
-    if not match:
-        raise HTTPException(status_code=400, detail="No accessible Jira resources found for this user.")
-
-    _save_oauth_doc({
+    # The cloud id of a site never changes: only ask Atlassian when we don't have it stored yet
+    doc = await _get_oauth_doc() or {}
+    if doc.get("cloud_id") and doc.get("cloud_url") == JIRA_SITE_URL:
+        match = {"id": doc["cloud_id"], "url": doc["cloud_url"]}
+    else:
+        resources = await _get_accessible_resources(access_token)
+        match = next((r for r in resources if (r.get("url") == JIRA_SITE_URL)), None)
+        if not match and resources:
+            match = resources[0]
+        if not match:
+            raise HTTPException(status_code=400, detail="No accessible Jira resources found for this user.")
+
+    await _save_oauth_doc({
         "access_token": access_token,
         "refresh_token": refresh_token,
         "expires_at": expires_at,
         "cloud_id": match["id"],
         "cloud_url": match["url"],
-        "oauth_state": None,
     })
 
-    return RedirectResponse(url=f"{FRONTEND_URL}/index.html?jira=connected", status_code=302)
+    resp = RedirectResponse(url=f"{FRONTEND_URL}/index.html?jira=connected", status_code=302)
+    resp.delete_cookie(_OAUTH_STATE_COOKIE, path="/oauth/atlassian")
+    return resp
 
 @router.get("/oauth/atlassian/status")
-def oauth_status():
-    doc = _get_oauth_doc()
+async def oauth_status():
+    doc = await _get_oauth_doc()
     if not doc:
         return {"connected": False}
     
@@ -352,34 +481,25 @@ def oauth_status():
 # ------------------------------------------------------------------------------------------------
 
 # ---- Jira helper endpoints ---------------------------------------------------------------------
+_USER_KEYS = ("accountId", "displayName", "emailAddress", "active")
+
 @router.get("/jira/user-search")
-def jira_user_search(q: str = Query(..., min_length=1)):
-    auth = _ensure_valid_access_token()
-    access_token = auth["access_token"]
-    cloud_id = auth["cloud_id"]
-
-    url = f"https://api.atlassian.com/ex/jira/{cloud_id}/rest/api/3/user/search"
-    r = requests.get(
-        url,
-        headers={"Authorization": f"Bearer {access_token}", "Accept": "application/json"},
+async def jira_user_search(q: str = Query(..., min_length=1)):
+    r, _ = await _jira_call(
+        "GET", "/rest/api/3/user/search",
         params={"query": q, "maxResults": 50},
         timeout=30,
     )
     if r.status_code >= 400:
         raise HTTPException(status_code=r.status_code, detail=r.text)
 
-    users = r.json()
-    return [{
-        "accountId": u.get("accountId"),
-        "displayName": u.get("displayName"),
-        "emailAddress": u.get("emailAddress"),
-        "active": u.get("active"),
-    } for u in users]
+    users = orjson.loads(r.content)
+    return [{k: u.get(k) for k in _USER_KEYS} for u in users]
 # ------------------------------------------------------------------------------------------------
 
 # ---- Bulk create route -------------------------------------------------------------------------
 @router.post("/jira/bulk-create")
-def jira_bulk_create(
+async def jira_bulk_create(
     payload: Payload,
     issue_type: str = Query(..., description='Must be "Test" or "Bug"'),
     create_links: bool = Query(False),
@@ -387,36 +507,32 @@ def jira_bulk_create(
     if issue_type not in ("Test", "Bug"):
         raise HTTPException(status_code=400, detail='issue_type must be "Test" or "Bug"')
 
-    rows = [
-        r for r in payload.rows
-        if any([r.summary, r.issue_type, r.description, r.link_relates, r.assignee, r.labels, r.nsoc_team, r.severity])
-    ]
-    if not rows:
-        raise HTTPException(status_code=400, detail="No non-empty rows to create.")
-    if len(rows) > 50:
-        raise HTTPException(status_code=400, detail="Bulk create supports up to 50 issues per request.")
-
-    auth = _ensure_valid_access_token()
-    access_token = auth["access_token"]
-    cloud_id = auth["cloud_id"]
-
-    url = f"https://api.atlassian.com/ex/jira/{cloud_id}/rest/api/3/issue/bulk"
-
+    # Single pass: skip empty rows, count the rest for the limit and build the updates
+    n_rows = 0
     issue_updates: List[Dict[str, Any]] = []
     kept_rows: List[Row] = []
+    issuetype_field = {"name": issue_type}  # same for every row; shared, the payload is only serialized
+
+    for r in payload.rows:
+        if not any((r.summary, r.issue_type, r.description, r.link_relates, r.assignee, r.labels, r.nsoc_team, r.severity)):
+            continue
+        n_rows += 1
+        if n_rows > MAX_BULK_ISSUES:
+            # Bail before paying for ADF conversion on a request that will be rejected anyway
+            raise HTTPException(status_code=400, detail="Bulk create supports up to 50 issues per request.")
 
-    for r in rows:
         summary = (r.summary or "").strip()
         if not summary:
             continue
 
-        labels_list = [x for x in (r.labels or "").split() if x]
-
+        labels_list = r.labels.split() if r.labels else []
         assignee_value = (r.assignee or "").strip()
+        nsoc_team = (r.nsoc_team or "").strip()
+        severity = (r.severity or "").strip()
 
         fields: Dict[str, Any] = {
-            "project": {"key": JIRA_PROJECT_KEY},
-            "issuetype": {"name": issue_type},
+            "project": _PROJECT_FIELD,
+            "issuetype": issuetype_field,
             "summary": summary,
             "description": adf_from_plain(r.description),
             "labels": labels_list,
@@ -425,22 +541,24 @@ def jira_bulk_create(
         if assignee_value:
             fields["assignee"] = {"accountId": assignee_value}
 
-        if CF_NSOC_TEAM and (r.nsoc_team or "").strip():
-            fields[CF_NSOC_TEAM] = {"value": (r.nsoc_team or "").strip()}
+        if CF_NSOC_TEAM and nsoc_team:
+            fields[CF_NSOC_TEAM] = {"value": nsoc_team}
 
-        if CF_SEVERITY and (r.severity or "").strip():
-            fields[CF_SEVERITY] = {"value": (r.severity or "").strip()}
+        if CF_SEVERITY and severity:
+            fields[CF_SEVERITY] = {"value": severity}
 
         issue_updates.append({"fields": fields, "update": {}})
         kept_rows.append(r)
 
+    if not n_rows:
+        raise HTTPException(status_code=400, detail="No non-empty rows to create.")
     if not issue_updates:
         raise HTTPException(status_code=400, detail="No valid issues (missing summary?).")
 
-    resp = requests.post(
-        url,
-        headers={"Authorization": f"Bearer {access_token}", "Accept": "application/json", "Content-Type": "application/json"},
-        json={"issueUpdates": issue_updates},
+    resp, auth = await _jira_call(
+        "POST", "/rest/api/3/issue/bulk",
+        headers={"Content-Type": "application/json"},
+        content=orjson.dumps({"issueUpdates": issue_updates}),
         timeout=60,
     )
     if resp.status_code == 401:
@@ -448,7 +566,7 @@ def jira_bulk_create(
     if resp.status_code >= 400:
         raise HTTPException(status_code=resp.status_code, detail=resp.text)
 
-    bulk_json = resp.json()
+    bulk_json = orjson.loads(resp.content)
 
     idx_to_key = _parse_bulk_index_map(bulk_json, len(issue_updates))
     created = [
@@ -456,15 +574,26 @@ def jira_bulk_create(
         for idx, key in sorted(idx_to_key.items(), key=lambda x: x[0])
     ] 
 
+    links: List[Dict[str, Any]] = []
     if create_links:
         link_type = JIRA_LINK_TYPE_TEST if issue_type == "Test" else JIRA_LINK_TYPE_BUG
-               
-        for idx, row in enumerate(kept_rows):
-            created_key = idx_to_key.get(idx)
-            if not created_key:
-                continue
-            for to_key in _split_issue_keys(row.link_relates):
-                _create_issue_link(cloud_id, access_token, link_type, created_key, to_key)
-
-    return {"created": created, "jira_base_url": auth.get("cloud_url")}
 
+        # No bulk link endpoint in Jira, but the calls are independent -> overlap them,
+        # bounded so a large bulk doesn't trip Jira's rate limiting
+        # dict.fromkeys: drop repeated (from, to) pairs, keep first-seen order
+        pairs = list(dict.fromkeys(
+            (created_key, to_key)
+            for idx, row in enumerate(kept_rows)
+            if (created_key := idx_to_key.get(idx))
+            for to_key in _split_issue_keys(row.link_relates)
+        ))
+        sem = asyncio.Semaphore(LINK_CONCURRENCY)
+        link_headers = {**auth["auth_headers"], "Content-Type": "application/json"}
+
+        async def link(from_key: str, to_key: str) -> Dict[str, Any]:
+            async with sem:
+                return await _create_issue_link(auth["jira_api_base"], link_headers, link_type, from_key, to_key)
+
+        links = await asyncio.gather(*[link(from_key, to_key) for from_key, to_key in pairs])
+
+    return {"created": created, "links": links, "jira_base_url": auth.get("cloud_url")}
@@ -0,0 +1,23 @@
+from typing import Any, Callable
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+class ORJSONRequest(Request):
+    async def json(self) -> Any:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI still answers 422
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """
+    Route class that parses JSON request bodies with orjson instead of stdlib json.
+    """
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
@@ -0,0 +1,26 @@
+from backend.routers.jira import _parse_bulk_index_map
+
+
+def _resp(keys, failed):
+    return {
+        "issues": [{"key": k} for k in keys],
+        "errors": [{"failedElementNumber": n, "elementErrors": {}} for n in failed],
+    }
+
+
+def test_bulk_index_map_zero_based_failures():
+    # 4 updates, element 1 (0-based) failed
+    resp = _resp(["P-1", "P-2", "P-3"], [1])
+    assert _parse_bulk_index_map(resp, 4) == {0: "P-1", 2: "P-2", 3: "P-3"}
+
+
+def test_bulk_index_map_one_based_failures():
+    # 4 updates, the last element failed, reported 1-based as 4
+    resp = _resp(["P-1", "P-2", "P-3"], [4])
+    assert _parse_bulk_index_map(resp, 4) == {0: "P-1", 1: "P-2", 2: "P-3"}
+
+
+def test_bulk_index_map_ignores_non_int_failed_element_number():
+    resp = _resp(["P-1", "P-2"], [])
+    resp["errors"] = [{"failedElementNumber": "1"}, {"elementErrors": {}}]
+    assert _parse_bulk_index_map(resp, 2) == {0: "P-1", 1: "P-2"}
@@ -641,7 +641,14 @@ async function createInJira() {
 }
 
 // ===== CSV API =====
+let csvBlobUrl = null; // object URL behind the current "Download CSV" button
+
 async function saveCSV() {
+  // The previous download button is about to be replaced: release its blob
+  if (csvBlobUrl) {
+    URL.revokeObjectURL(csvBlobUrl);
+    csvBlobUrl = null;
+  }
   statusEl.textContent = "Saving…";
   const rows = gatherRows();
   if (rows.length === 0) {
@@ -658,25 +665,30 @@ async function saveCSV() {
     });
 
     if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
-    const json = await res.json();
 
-    if (json && json.filename) {
-      statusEl.textContent = "";
+    // The CSV comes back in the response body; filename is in Content-Disposition
+    const disposition = res.headers.get("Content-Disposition") || "";
+    const match = disposition.match(/filename="?([^";]+)"?/);
+    const filename = match ? match[1] : `${selected_value}-ticket.csv`;
+    const blobUrl = URL.createObjectURL(await res.blob());
+    csvBlobUrl = blobUrl;
 
-      const downloadBtn = Object.assign(document.createElement("button"), {
-        className: "btn",
-        type: "button",
-        innerText: "⬇️ Download CSV",
-      });
+    statusEl.textContent = "";
 
-      downloadBtn.addEventListener("click", () => {
-        window.open(`${API_BASE}/download/${encodeURIComponent(json.filename)}`, "_blank");
-      });
+    const downloadBtn = Object.assign(document.createElement("button"), {
+      className: "btn",
+      type: "button",
+      innerText: "⬇️ Download CSV",
+    });
 
-      statusEl.appendChild(downloadBtn);
-    } else {
-      statusEl.textContent = "Saved, but no filename returned.";
-    }
+    downloadBtn.addEventListener("click", () => {
+      const a = Object.assign(document.createElement("a"), { href: blobUrl, download: filename });
+      document.body.appendChild(a);
+      a.click();
+      a.remove();
+    });
+
+    statusEl.appendChild(downloadBtn);
   } catch (err) {
     console.error(err);
     statusEl.textContent = "Error saving CSV. See console.";